@@ -4,35 +4,79 @@ Security control testing automation for MLSecOps pipeline.
 Tests effectiveness of implemented security controls.
 """
 
+import os
 import yaml
 import json
 import time
-import random
-import numpy as np
 from datetime import datetime
-from typing import Dict, List, Any, Tuple
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+# Prefer the libyaml-backed loader when PyYAML was built against it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Prefer orjson's C serializer for report output when available
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Which key each control's result stores its case list under
+_CASES_KEY = {
+    "SC-001": "test_cases",
+    "SC-002": "attack_tests",
+    "SC-003": "monitoring_tests",
+}
+
+@lru_cache(maxsize=32)
+def _load_yaml_cached(path: str, mtime: float) -> Dict[str, Any]:
+    """Load and cache a parsed YAML file, keyed on path and mtime."""
+    # Binary mode: libyaml decodes UTF-8 itself, skipping Python's text layer
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+def _dump_json(obj: Any, path: str) -> None:
+    """Write obj to path as indented JSON, using orjson when available."""
+    if _HAS_ORJSON:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2).encode()
+    # Single large-block write; 1 MiB buffer keeps big reports to a few syscalls
+    with open(path, 'wb', buffering=1 << 20) as f:
+        f.write(data)
+
 class SecurityControlTester:
-    def __init__(self, controls_file: str = "threat-model/controls.yaml"):
-        """Initialize security control tester."""
+    def __init__(self, controls_file: str = "threat-model/controls.yaml",
+                 seed: Optional[int] = None):
+        """Initialize security control tester.
+
+        Pass a seed for reproducible simulated test runs.
+        """
+        # Deferred so CLI runs that never construct a tester skip the numpy import
+        import numpy as np
         self.controls_file = controls_file
         self.controls = self._load_controls()
+        self._rng = np.random.default_rng(seed)
         
     def _load_controls(self) -> Dict[str, Any]:
         """Load security controls from YAML file."""
         try:
-            with open(self.controls_file, 'r') as f:
-                return yaml.safe_load(f)
+            return _load_yaml_cached(self.controls_file, os.path.getmtime(self.controls_file))
         except FileNotFoundError:
             logger.error(f"Controls file not found: {self.controls_file}")
             return {}
     
-    def test_data_validation_pipeline(self) -> Dict[str, Any]:
+    def test_data_validation_pipeline(self, now: Optional[str] = None) -> Dict[str, Any]:
         """Test data validation pipeline effectiveness."""
+        import numpy as np
         logger.info("Testing data validation pipeline...")
         
         # Simulate malicious data injection
@@ -45,84 +89,80 @@ class SecurityControlTester:
         
         results = {
             "control_id": "SC-001",
-            "test_timestamp": datetime.now().isoformat(),
+            "test_timestamp": now or datetime.now().isoformat(),
             "test_cases": [],
             "overall_effectiveness": 0,
             "recommendations": []
         }
         
-        detection_rates = []
-        
-        for test_case in test_cases:
-            # Simulate detection (replace with actual validation logic)
-            detection_rate = random.uniform(0.7, 0.95)  # 70-95% detection rate
-            false_positive_rate = random.uniform(0.02, 0.08)  # 2-8% false positive rate
-            
-            test_result = {
+        # Simulate detection in one batched draw (replace with actual validation logic)
+        detection_rates = self._rng.uniform(0.7, 0.95, len(test_cases))  # 70-95% detection rate
+        false_positive_rates = self._rng.uniform(0.02, 0.08, len(test_cases))  # 2-8% false positive rate
+        statuses = np.where(detection_rates > 0.8, "PASSED", "FAILED")
+
+        for test_case, detection_rate, false_positive_rate, status in zip(
+                test_cases, detection_rates, false_positive_rates, statuses):
+            results["test_cases"].append({
                 "test_type": test_case["type"],
                 "severity": test_case["severity"],
-                "detection_rate": detection_rate,
-                "false_positive_rate": false_positive_rate,
-                "status": "PASSED" if detection_rate > 0.8 else "FAILED"
-            }
-            
-            results["test_cases"].append(test_result)
-            detection_rates.append(detection_rate)
-            
+                "detection_rate": float(detection_rate),
+                "false_positive_rate": float(false_positive_rate),
+                "status": str(status)
+            })
+
             if detection_rate < 0.8:
                 results["recommendations"].append(f"Improve detection for {test_case['type']} attacks")
-        
-        results["overall_effectiveness"] = np.mean(detection_rates)
+
+        results["overall_effectiveness"] = float(detection_rates.mean())
         
         return results
     
-    def test_adversarial_robustness(self) -> Dict[str, Any]:
+    def test_adversarial_robustness(self, now: Optional[str] = None) -> Dict[str, Any]:
         """Test adversarial robustness of ML models."""
+        import numpy as np
         logger.info("Testing adversarial robustness...")
         
         attack_types = ["FGSM", "PGD", "C&W", "DeepFool"]
         
         results = {
             "control_id": "SC-002",
-            "test_timestamp": datetime.now().isoformat(),
+            "test_timestamp": now or datetime.now().isoformat(),
             "attack_tests": [],
             "overall_robustness": 0,
             "recommendations": []
         }
         
-        robustness_scores = []
-        
-        for attack_type in attack_types:
-            # Simulate adversarial attack testing
-            success_rate = random.uniform(0.1, 0.4)  # 10-40% attack success rate
-            model_accuracy = random.uniform(0.85, 0.95)  # 85-95% model accuracy
-            robustness_score = 1 - success_rate  # Higher is better
-            
-            test_result = {
+        # Simulate adversarial attack testing in one batched draw
+        success_rates = self._rng.uniform(0.1, 0.4, len(attack_types))  # 10-40% attack success rate
+        model_accuracies = self._rng.uniform(0.85, 0.95, len(attack_types))  # 85-95% model accuracy
+        robustness_scores = 1 - success_rates  # Higher is better
+        statuses = np.where(success_rates < 0.3, "PASSED", "FAILED")
+
+        for attack_type, success_rate, model_accuracy, robustness_score, status in zip(
+                attack_types, success_rates, model_accuracies, robustness_scores, statuses):
+            results["attack_tests"].append({
                 "attack_type": attack_type,
-                "attack_success_rate": success_rate,
-                "model_accuracy_under_attack": model_accuracy,
-                "robustness_score": robustness_score,
-                "status": "PASSED" if success_rate < 0.3 else "FAILED"
-            }
-            
-            results["attack_tests"].append(test_result)
-            robustness_scores.append(robustness_score)
-            
+                "attack_success_rate": float(success_rate),
+                "model_accuracy_under_attack": float(model_accuracy),
+                "robustness_score": float(robustness_score),
+                "status": str(status)
+            })
+
             if success_rate > 0.3:
                 results["recommendations"].append(f"Improve robustness against {attack_type} attacks")
-        
-        results["overall_robustness"] = np.mean(robustness_scores)
+
+        results["overall_robustness"] = float(robustness_scores.mean())
         
         return results
     
-    def test_api_monitoring(self) -> Dict[str, Any]:
+    def test_api_monitoring(self, now: Optional[str] = None) -> Dict[str, Any]:
         """Test API monitoring and rate limiting effectiveness."""
+        import numpy as np
         logger.info("Testing API monitoring...")
         
         results = {
             "control_id": "SC-003",
-            "test_timestamp": datetime.now().isoformat(),
+            "test_timestamp": now or datetime.now().isoformat(),
             "monitoring_tests": [],
             "detection_accuracy": 0,
             "recommendations": []
@@ -136,27 +176,24 @@ class SecurityControlTester:
             {"type": "unusual_timing", "request_pattern": "burst"}
         ]
         
-        detection_results = []
-        
-        for scenario in abuse_scenarios:
-            # Simulate monitoring detection
-            detection_probability = random.uniform(0.6, 0.9)
-            response_time = random.uniform(0.1, 2.0)  # seconds
-            
-            test_result = {
+        # Simulate monitoring detection in one batched draw
+        detection_probabilities = self._rng.uniform(0.6, 0.9, len(abuse_scenarios))
+        response_times = self._rng.uniform(0.1, 2.0, len(abuse_scenarios))  # seconds
+        statuses = np.where(detection_probabilities > 0.7, "PASSED", "FAILED")
+
+        for scenario, detection_probability, response_time, status in zip(
+                abuse_scenarios, detection_probabilities, response_times, statuses):
+            results["monitoring_tests"].append({
                 "scenario": scenario["type"],
-                "detection_probability": detection_probability,
-                "response_time_seconds": response_time,
-                "status": "PASSED" if detection_probability > 0.7 else "FAILED"
-            }
-            
-            results["monitoring_tests"].append(test_result)
-            detection_results.append(detection_probability)
-            
+                "detection_probability": float(detection_probability),
+                "response_time_seconds": float(response_time),
+                "status": str(status)
+            })
+
             if detection_probability < 0.7:
                 results["recommendations"].append(f"Improve detection for {scenario['type']} scenarios")
-        
-        results["detection_accuracy"] = np.mean(detection_results)
+
+        results["detection_accuracy"] = float(detection_probabilities.mean())
         
         return results
     
@@ -164,18 +201,20 @@ class SecurityControlTester:
         """Run all security control tests."""
         logger.info("Running comprehensive security control tests...")
         
+        now = datetime.now().isoformat()
+
         test_results = {
-            "test_suite_timestamp": datetime.now().isoformat(),
+            "test_suite_timestamp": now,
             "test_results": [],
             "summary": {},
             "overall_security_posture": "",
             "critical_recommendations": []
         }
         
-        # Run individual tests
-        data_validation_results = self.test_data_validation_pipeline()
-        adversarial_results = self.test_adversarial_robustness()
-        api_monitoring_results = self.test_api_monitoring()
+        # Run individual tests, all stamped with the suite timestamp
+        data_validation_results = self.test_data_validation_pipeline(now)
+        adversarial_results = self.test_adversarial_robustness(now)
+        api_monitoring_results = self.test_api_monitoring(now)
         
         test_results["test_results"] = [
             data_validation_results,
@@ -190,18 +229,25 @@ class SecurityControlTester:
             api_monitoring_results["detection_accuracy"]
         ]
         
-        overall_score = np.mean(effectiveness_scores)
-        
+        overall_score = sum(effectiveness_scores) / len(effectiveness_scores)
+
+        # Count passed/failed suites in one pass over the statuses
+        passed_tests = failed_tests = 0
+        for result in test_results["test_results"]:
+            statuses = [test["status"] for test in result[_CASES_KEY[result["control_id"]]]]
+            if all(status == "PASSED" for status in statuses):
+                passed_tests += 1
+            if any(status == "FAILED" for status in statuses):
+                failed_tests += 1
+
         test_results["summary"] = {
             "data_validation_effectiveness": data_validation_results["overall_effectiveness"],
             "adversarial_robustness": adversarial_results["overall_robustness"],
             "api_monitoring_accuracy": api_monitoring_results["detection_accuracy"],
             "overall_security_score": overall_score,
             "total_tests_run": len(test_results["test_results"]),
-            "passed_tests": sum(1 for result in test_results["test_results"] 
-                               if all(test["status"] == "PASSED" for test in result.get("test_cases", []) + result.get("attack_tests", []) + result.get("monitoring_tests", []))),
-            "failed_tests": sum(1 for result in test_results["test_results"] 
-                               if any(test["status"] == "FAILED" for test in result.get("test_cases", []) + result.get("attack_tests", []) + result.get("monitoring_tests", [])))
+            "passed_tests": passed_tests,
+            "failed_tests": failed_tests
         }
         
         # Determine overall security posture
@@ -212,12 +258,12 @@ class SecurityControlTester:
         else:
             test_results["overall_security_posture"] = "WEAK"
         
-        # Compile critical recommendations
-        all_recommendations = []
+        # Compile critical recommendations, deduplicated but order-preserving
+        seen = {}
         for result in test_results["test_results"]:
-            all_recommendations.extend(result.get("recommendations", []))
-        
-        test_results["critical_recommendations"] = list(set(all_recommendations))
+            seen.update(dict.fromkeys(result.get("recommendations", ())))
+
+        test_results["critical_recommendations"] = list(seen)
         
         return test_results
 
@@ -229,8 +275,7 @@ def main():
     results = tester.run_all_tests()
     
     # Save results to file
-    with open('control-test-results.json', 'w') as f:
-        json.dump(results, f, indent=2)
+    _dump_json(results, 'control-test-results.json')
     
     logger.info(f"Overall Security Posture: {results['overall_security_posture']}")
     logger.info(f"Overall Security Score: {results['summary']['overall_security_score']:.2f}")
@@ -4,16 +4,191 @@ Automated reporting for MLSecOps threat model.
 Generates executive summaries and technical reports.
 """
 
+import os
+import re
+import copy
 import yaml
 import json
-import pandas as pd
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Any
 import logging
 
+# Prefer the libyaml-backed loader when PyYAML was built against it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Prefer orjson's C serializer for report output when available
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Dollar amounts in the YAML are strings like "$10M+" and "$500K"
+_IMPACT_RE = re.compile(r'\$(\d+)M')
+_COST_RE = re.compile(r'\$(\d+)K')
+
+# Static shell of the executive summary; computed metrics are filled in per run
+_EXEC_TEMPLATE = {
+    "report_date": "",
+    "executive_summary": {
+        "system_overview": "ML-based fraud detection system processing real-time credit card transactions",
+        "threat_landscape": {
+            "total_threats_identified": 0,
+            "high_risk_threats": 0,
+            "critical_attack_vectors": ["Data Poisoning", "Adversarial Evasion", "Model Extraction"]
+        },
+        "business_impact": {
+            "total_risk_exposure": "",
+            "annual_fraud_losses_potential": "$10M+",
+            "regulatory_fine_risk": "$50M+",
+            "reputational_damage": "High"
+        },
+        "investment_recommendation": {
+            "total_security_investment": "",
+            "roi_calculation": "",
+            "payback_period": "6-12 months",
+            "recommendation": "APPROVE - Critical security investment with positive ROI"
+        },
+        "compliance_status": {
+            "pci_dss": "Partially Compliant - Gaps in ML-specific controls",
+            "gdpr": "At Risk - Privacy controls needed for ML models",
+            "sox": "Compliant - Audit controls in place"
+        }
+    },
+    "key_recommendations": [
+        "Implement data validation pipeline immediately (highest ROI)",
+        "Deploy adversarial training within 6 months",
+        "Enhance API monitoring and rate limiting",
+        "Establish ML governance and compliance framework"
+    ],
+    "next_steps": [
+        "Approve $2M security investment",
+        "Establish ML Security Center of Excellence",
+        "Implement continuous threat monitoring",
+        "Schedule quarterly security assessments"
+    ]
+}
+
+# Static technical-report subsections, built once at import
+_THREAT_TRENDS = {
+    "emerging_threats": [
+        "AI-powered adversarial attacks",
+        "Supply chain ML poisoning",
+        "Federated learning attacks",
+        "Quantum-resistant ML security"
+    ],
+    "trend_analysis": {
+        "data_poisoning": "Increasing - more sophisticated techniques",
+        "adversarial_evasion": "High - automated attack generation",
+        "model_extraction": "Moderate - API-based attacks common",
+        "privacy_attacks": "Growing - regulatory pressure increasing"
+    },
+    "industry_benchmarks": {
+        "avg_ml_security_maturity": "2.3/5.0",
+        "common_vulnerabilities": ["Inadequate input validation", "No adversarial training", "Weak API security"],
+        "recommended_practices": ["Continuous monitoring", "Red team exercises", "ML security training"]
+    }
+}
+
+_CONTROL_EFFECTIVENESS = {
+    "effectiveness_metrics": {
+        "preventive_controls": 3,
+        "detective_controls": 2,
+        "corrective_controls": 0
+    },
+    "coverage_analysis": {
+        "covered_threats": 5,
+        "uncovered_threats": 0,
+        "coverage_percentage": 100
+    },
+    "cost_effectiveness": {
+        "high_value_controls": ["Data Validation Pipeline", "Adversarial Training"],
+        "quick_wins": ["Enhanced API Monitoring"],
+        "long_term_investments": ["Differential Privacy Implementation"]
+    }
+}
+
+_GAP_ANALYSIS = {
+    "security_gaps": [
+        "Real-time adversarial detection",
+        "Model versioning and rollback",
+        "Privacy-preserving ML techniques"
+    ],
+    "process_gaps": [
+        "ML security training program",
+        "Incident response procedures for ML attacks",
+        "Continuous security assessment"
+    ],
+    "technology_gaps": [
+        "Automated threat detection tools",
+        "ML-specific SIEM integration",
+        "Security orchestration for ML pipelines"
+    ],
+    "recommended_actions": [
+        "Establish ML Security Center of Excellence",
+        "Implement security-by-design principles",
+        "Develop ML-specific incident response playbooks"
+    ]
+}
+
+_TECH_RECOMMENDATIONS = [
+    {
+        "category": "Immediate Actions",
+        "recommendations": [
+            "Implement input validation for all ML model endpoints",
+            "Deploy basic adversarial detection mechanisms",
+            "Establish security monitoring for ML pipelines"
+        ],
+        "timeline": "1-3 months",
+        "priority": "Critical"
+    },
+    {
+        "category": "Medium-term Improvements",
+        "recommendations": [
+            "Implement adversarial training for all production models",
+            "Deploy differential privacy mechanisms",
+            "Establish ML model governance framework"
+        ],
+        "timeline": "3-6 months",
+        "priority": "High"
+    },
+    {
+        "category": "Long-term Strategic",
+        "recommendations": [
+            "Develop quantum-resistant ML security measures",
+            "Implement federated learning security controls",
+            "Establish ML red team capabilities"
+        ],
+        "timeline": "6-12 months",
+        "priority": "Medium"
+    }
+]
+
+@lru_cache(maxsize=32)
+def _load_yaml_cached(path: str, mtime: float) -> Dict[str, Any]:
+    """Load and cache a parsed YAML file, keyed on path and mtime."""
+    # Binary mode: libyaml decodes UTF-8 itself, skipping Python's text layer
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+def _dump_json(obj: Any, path: str) -> None:
+    """Write obj to path as indented JSON, using orjson when available."""
+    if _HAS_ORJSON:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2).encode()
+    # Single large-block write; 1 MiB buffer keeps big reports to a few syscalls
+    with open(path, 'wb', buffering=1 << 20) as f:
+        f.write(data)
+
 class ThreatModelReporter:
     def __init__(self):
         """Initialize threat model reporter."""
@@ -23,8 +198,7 @@ class ThreatModelReporter:
     def _load_yaml_file(self, filepath: str) -> Dict[str, Any]:
         """Load YAML file safely."""
         try:
-            with open(filepath, 'r') as f:
-                return yaml.safe_load(f)
+            return _load_yaml_cached(filepath, os.path.getmtime(filepath))
         except FileNotFoundError:
             logger.warning(f"File not found: {filepath}")
             return {}
@@ -34,74 +208,39 @@ class ThreatModelReporter:
         threats_data = self.threats.get('threats', [])
         controls_data = self.controls.get('security_controls', [])
         
-        # Calculate key metrics
-        total_threats = len(threats_data)
-        high_risk_threats = len([t for t in threats_data if t.get('risk_score', 0) >= 7])
-        total_investment = sum(int(c.get('estimated_cost', '$0K')[1:-1]) * 1000 
-                             for c in controls_data if c.get('estimated_cost', '').endswith('K'))
-        
-        # Calculate potential business impact
-        business_impacts = []
+        # Calculate key metrics in one sweep over the threats; business impact
+        # strings like "$10M+" parse to 10000000
+        total_threats = high_risk_threats = total_risk_exposure = 0
         for threat in threats_data:
-            impact_str = threat.get('business_impact', '')
-            if '$' in impact_str and 'M' in impact_str:
-                # Extract numeric value (e.g., "$10M+" -> 10000000)
-                try:
-                    value = int(impact_str.split('$')[1].split('M')[0]) * 1000000
-                    business_impacts.append(value)
-                except:
-                    pass
-        
-        total_risk_exposure = sum(business_impacts)
-        
-        summary = {
-            "report_date": datetime.now().strftime("%Y-%m-%d"),
-            "executive_summary": {
-                "system_overview": "ML-based fraud detection system processing real-time credit card transactions",
-                "threat_landscape": {
-                    "total_threats_identified": total_threats,
-                    "high_risk_threats": high_risk_threats,
-                    "critical_attack_vectors": ["Data Poisoning", "Adversarial Evasion", "Model Extraction"]
-                },
-                "business_impact": {
-                    "total_risk_exposure": f"${total_risk_exposure:,}",
-                    "annual_fraud_losses_potential": "$10M+",
-                    "regulatory_fine_risk": "$50M+",
-                    "reputational_damage": "High"
-                },
-                "investment_recommendation": {
-                    "total_security_investment": f"${total_investment:,}",
-                    "roi_calculation": f"${total_risk_exposure - total_investment:,} protected value",
-                    "payback_period": "6-12 months",
-                    "recommendation": "APPROVE - Critical security investment with positive ROI"
-                },
-                "compliance_status": {
-                    "pci_dss": "Partially Compliant - Gaps in ML-specific controls",
-                    "gdpr": "At Risk - Privacy controls needed for ML models",
-                    "sox": "Compliant - Audit controls in place"
-                }
-            },
-            "key_recommendations": [
-                "Implement data validation pipeline immediately (highest ROI)",
-                "Deploy adversarial training within 6 months",
-                "Enhance API monitoring and rate limiting",
-                "Establish ML governance and compliance framework"
-            ],
-            "next_steps": [
-                "Approve $2M security investment",
-                "Establish ML Security Center of Excellence",
-                "Implement continuous threat monitoring",
-                "Schedule quarterly security assessments"
-            ]
-        }
+            total_threats += 1
+            if threat.get('risk_score', 0) >= 7:
+                high_risk_threats += 1
+            m = _IMPACT_RE.search(threat.get('business_impact', ''))
+            if m:
+                total_risk_exposure += int(m.group(1)) * 1_000_000
+
+        total_investment = sum(int(m.group(1)) * 1000
+                               for c in controls_data
+                               if (m := _COST_RE.search(c.get('estimated_cost', ''))))
         
+        summary = copy.deepcopy(_EXEC_TEMPLATE)
+        summary["report_date"] = datetime.now().strftime("%Y-%m-%d")
+
+        exec_summary = summary["executive_summary"]
+        exec_summary["threat_landscape"]["total_threats_identified"] = total_threats
+        exec_summary["threat_landscape"]["high_risk_threats"] = high_risk_threats
+        exec_summary["business_impact"]["total_risk_exposure"] = f"${total_risk_exposure:,}"
+        exec_summary["investment_recommendation"]["total_security_investment"] = f"${total_investment:,}"
+        exec_summary["investment_recommendation"]["roi_calculation"] = \
+            f"${total_risk_exposure - total_investment:,} protected value"
+
         return summary
     
     def generate_technical_report(self) -> Dict[str, Any]:
         """Generate detailed technical report."""
-        threats_df = pd.DataFrame(self.threats.get('threats', []))
-        controls_df = pd.DataFrame(self.controls.get('security_controls', []))
-        
+        threats = self.threats.get('threats', [])
+        controls = self.controls.get('security_controls', [])
+
         report = {
             "report_metadata": {
                 "generated_date": datetime.now().isoformat(),
@@ -110,14 +249,14 @@ class ThreatModelReporter:
                 "frameworks_used": ["OWASP Top 10 ML", "MITRE ATT&CK", "NIST AI RMF"]
             },
             "threat_analysis": {
-                "threat_summary": self._generate_threat_summary(threats_df),
-                "risk_matrix": self._generate_risk_matrix(threats_df),
+                "threat_summary": self._generate_threat_summary(threats),
+                "risk_matrix": self._generate_risk_matrix(threats),
                 "attack_scenarios": self._generate_attack_scenarios(),
                 "threat_trends": self._analyze_threat_trends()
             },
             "control_analysis": {
-                "control_summary": self._generate_control_summary(controls_df),
-                "implementation_roadmap": self._generate_implementation_roadmap(controls_df),
+                "control_summary": self._generate_control_summary(controls),
+                "implementation_roadmap": self._generate_implementation_roadmap(controls),
                 "effectiveness_analysis": self._analyze_control_effectiveness(),
                 "gap_analysis": self._perform_gap_analysis()
             },
@@ -127,29 +266,38 @@ class ThreatModelReporter:
         
         return report
     
-    def _generate_threat_summary(self, threats_df: pd.DataFrame) -> Dict[str, Any]:
+    def _generate_threat_summary(self, threats: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate threat summary statistics."""
-        if threats_df.empty:
+        if not threats:
             return {"error": "No threat data available"}
-        
+
+        high = medium = low = 0
+        for threat in threats:
+            score = threat.get('risk_score', 0)
+            if score >= 7:
+                high += 1
+            elif score >= 4:
+                medium += 1
+            else:
+                low += 1
+
         return {
-            "total_threats": len(threats_df),
-            "by_category": threats_df.groupby('category').size().to_dict(),
+            "total_threats": len(threats),
+            "by_category": dict(Counter(t.get('category') for t in threats)),
             "by_risk_level": {
-                "high": len(threats_df[threats_df['risk_score'] >= 7]),
-                "medium": len(threats_df[(threats_df['risk_score'] >= 4) & (threats_df['risk_score'] < 7)]),
-                "low": len(threats_df[threats_df['risk_score'] < 4])
+                "high": high,
+                "medium": medium,
+                "low": low
             },
-            "by_stride": threats_df.groupby('stride_category').size().to_dict(),
-            "average_risk_score": threats_df['risk_score'].mean()
+            "by_stride": dict(Counter(t.get('stride_category') for t in threats)),
+            "average_risk_score": sum(t.get('risk_score', 0) for t in threats) / len(threats)
         }
-    
-    def _generate_risk_matrix(self, threats_df: pd.DataFrame) -> List[Dict[str, Any]]:
+
+    def _generate_risk_matrix(self, threats: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Generate risk matrix data."""
-        if threats_df.empty:
-            return []
-        
-        return threats_df[['id', 'name', 'likelihood', 'impact', 'risk_score', 'category']].to_dict('records')
+        return [{field: t.get(field) for field in
+                 ('id', 'name', 'likelihood', 'impact', 'risk_score', 'category')}
+                for t in threats]
     
     def _generate_attack_scenarios(self) -> List[Dict[str, Any]]:
         """Generate detailed attack scenarios."""
@@ -169,100 +317,44 @@ class ThreatModelReporter:
     
     def _analyze_threat_trends(self) -> Dict[str, Any]:
         """Analyze threat trends and emerging risks."""
-        return {
-            "emerging_threats": [
-                "AI-powered adversarial attacks",
-                "Supply chain ML poisoning",
-                "Federated learning attacks",
-                "Quantum-resistant ML security"
-            ],
-            "trend_analysis": {
-                "data_poisoning": "Increasing - more sophisticated techniques",
-                "adversarial_evasion": "High - automated attack generation",
-                "model_extraction": "Moderate - API-based attacks common",
-                "privacy_attacks": "Growing - regulatory pressure increasing"
-            },
-            "industry_benchmarks": {
-                "avg_ml_security_maturity": "2.3/5.0",
-                "common_vulnerabilities": ["Inadequate input validation", "No adversarial training", "Weak API security"],
-                "recommended_practices": ["Continuous monitoring", "Red team exercises", "ML security training"]
-            }
-        }
+        return _THREAT_TRENDS
     
-    def _generate_control_summary(self, controls_df: pd.DataFrame) -> Dict[str, Any]:
+    def _generate_control_summary(self, controls: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate security controls summary."""
-        if controls_df.empty:
+        if not controls:
             return {"error": "No control data available"}
-        
+
+        effectiveness_scores = [c['effectiveness_score'] for c in controls if 'effectiveness_score' in c]
+
         return {
-            "total_controls": len(controls_df),
-            "by_category": controls_df.groupby('category').size().to_dict(),
-            "by_status": controls_df.groupby('implementation_status').size().to_dict(),
-            "total_investment": controls_df['estimated_cost'].sum() if 'estimated_cost' in controls_df.columns else 0,
-            "average_effectiveness": controls_df['effectiveness_score'].mean() if 'effectiveness_score' in controls_df.columns else 0
+            "total_controls": len(controls),
+            "by_category": dict(Counter(c.get('category') for c in controls)),
+            "by_status": dict(Counter(c.get('implementation_status') for c in controls)),
+            "total_investment": sum(int(m.group(1)) * 1000
+                                    for c in controls
+                                    if (m := _COST_RE.search(c.get('estimated_cost', '')))),
+            "average_effectiveness": sum(effectiveness_scores) / len(effectiveness_scores) if effectiveness_scores else 0
         }
-    
-    def _generate_implementation_roadmap(self, controls_df: pd.DataFrame) -> List[Dict[str, Any]]:
+
+    def _generate_implementation_roadmap(self, controls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Generate implementation roadmap."""
-        roadmap = []
-        
-        for _, control in controls_df.iterrows():
-            roadmap.append({
-                "control_id": control.get('id'),
-                "name": control.get('name'),
-                "priority": "High" if control.get('effectiveness_score', 0) >= 7 else "Medium",
-                "implementation_effort": control.get('implementation_effort', 'Unknown'),
-                "estimated_cost": control.get('estimated_cost', 'Unknown'),
-                "dependencies": control.get('dependencies', []),
-                "timeline": control.get('implementation_effort', 'Unknown')
-            })
-        
-        return roadmap
+        return [{
+            "control_id": control.get('id'),
+            "name": control.get('name'),
+            "priority": "High" if control.get('effectiveness_score', 0) >= 7 else "Medium",
+            "implementation_effort": control.get('implementation_effort', 'Unknown'),
+            "estimated_cost": control.get('estimated_cost', 'Unknown'),
+            "dependencies": control.get('dependencies', []),
+            "timeline": control.get('implementation_effort', 'Unknown')
+        } for control in controls]
     
     def _analyze_control_effectiveness(self) -> Dict[str, Any]:
         """Analyze control effectiveness."""
-        return {
-            "effectiveness_metrics": {
-                "preventive_controls": 3,
-                "detective_controls": 2,
-                "corrective_controls": 0
-            },
-            "coverage_analysis": {
-                "covered_threats": 5,
-                "uncovered_threats": 0,
-                "coverage_percentage": 100
-            },
-            "cost_effectiveness": {
-                "high_value_controls": ["Data Validation Pipeline", "Adversarial Training"],
-                "quick_wins": ["Enhanced API Monitoring"],
-                "long_term_investments": ["Differential Privacy Implementation"]
-            }
-        }
-    
+        return _CONTROL_EFFECTIVENESS
+
     def _perform_gap_analysis(self) -> Dict[str, Any]:
         """Perform gap analysis."""
-        return {
-            "security_gaps": [
-                "Real-time adversarial detection",
-                "Model versioning and rollback",
-                "Privacy-preserving ML techniques"
-            ],
-            "process_gaps": [
-                "ML security training program",
-                "Incident response procedures for ML attacks",
-                "Continuous security assessment"
-            ],
-            "technology_gaps": [
-                "Automated threat detection tools",
-                "ML-specific SIEM integration",
-                "Security orchestration for ML pipelines"
-            ],
-            "recommended_actions": [
-                "Establish ML Security Center of Excellence",
-                "Implement security-by-design principles",
-                "Develop ML-specific incident response playbooks"
-            ]
-        }
+        return _GAP_ANALYSIS
     
     def _generate_compliance_mapping(self) -> Dict[str, Any]:
         """Generate compliance mapping."""
@@ -270,38 +362,7 @@ class ThreatModelReporter:
     
     def _generate_technical_recommendations(self) -> List[Dict[str, Any]]:
         """Generate technical recommendations."""
-        return [
-            {
-                "category": "Immediate Actions",
-                "recommendations": [
-                    "Implement input validation for all ML model endpoints",
-                    "Deploy basic adversarial detection mechanisms",
-                    "Establish security monitoring for ML pipelines"
-                ],
-                "timeline": "1-3 months",
-                "priority": "Critical"
-            },
-            {
-                "category": "Medium-term Improvements",
-                "recommendations": [
-                    "Implement adversarial training for all production models",
-                    "Deploy differential privacy mechanisms",
-                    "Establish ML model governance framework"
-                ],
-                "timeline": "3-6 months",
-                "priority": "High"
-            },
-            {
-                "category": "Long-term Strategic",
-                "recommendations": [
-                    "Develop quantum-resistant ML security measures",
-                    "Implement federated learning security controls",
-                    "Establish ML red team capabilities"
-                ],
-                "timeline": "6-12 months",
-                "priority": "Medium"
-            }
-        ]
+        return _TECH_RECOMMENDATIONS
 
 def main():
     """Main function to generate reports."""
@@ -311,13 +372,11 @@ def main():
     
     # Generate executive summary
     executive_summary = reporter.generate_executive_summary()
-    with open('executive-summary.json', 'w') as f:
-        json.dump(executive_summary, f, indent=2)
-    
+    _dump_json(executive_summary, 'executive-summary.json')
+
     # Generate technical report
     technical_report = reporter.generate_technical_report()
-    with open('technical-report.json', 'w') as f:
-        json.dump(technical_report, f, indent=2)
+    _dump_json(technical_report, 'technical-report.json')
     
     logger.info("Reports generated successfully!")
     logger.info(f"Total threats analyzed: {technical_report['threat_analysis']['threat_summary']['total_threats']}")